@@ -0,0 +1,5 @@
+# src/friendlyui/__main__.py
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -4,12 +4,18 @@ import sys
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from .themes import apply_theme
 from .settings_dialog import ProjectSettingsDialog
-from .models import load_or_create_project, save_project, normalize_c_identifier
+from .models import load_or_create_project, save_project, unique_widget_id, check_project
+from .codegen import write_sources
 from .dock_left import LeftDock
+from .widgets_registry import known_widget_types
 from .dock_right import RightDock
+from .spatial import SpatialIndex, widget_box
+from .nodes import make_node, compact_project
+from .bindings import BindingEngine, BindingError
+from .thumbnails import ThumbnailCache
 
 class MainWindow(QMainWindow):
     def __init__(self, project_path: Path, app: QApplication):
@@ -17,6 +23,14 @@ class MainWindow(QMainWindow):
         self.app = app
         self.project_path = project_path
         self.data = load_or_create_project(self.project_path)
+        # ui.compact_nodes: держать дерево виджетов в WidgetNode вместо dict
+        self.compact = bool(self.data.get("ui", {}).get("compact_nodes", False))
+        if self.compact:
+            compact_project(self.data)
+        self._spatial: dict[int, SpatialIndex] = {}  # id(screen) -> индекс
+        self.bindings: BindingEngine | None = None
+        self.live_props: dict[str, dict] = {}  # widget_id -> значения props из привязок
+        self._bindings_gen = 0  # поколение движка: отложенный flush старого движка игнорируется
 
         self.setWindowTitle("FriendlyUI — LVGL Editor")
         self.resize(1400, 820)
@@ -33,11 +47,14 @@ class MainWindow(QMainWindow):
         self.left = LeftDock(
             get_project_dict=lambda: self.data,
             get_screen_cb=self._get_current_screen,
-            add_widget_cb=self._add_widget_from_palette
+            add_widget_cb=self._add_widget_from_palette,
+            set_var_cb=self._set_variable,
+            thumbs=ThumbnailCache(self.project_path, self)
         )
         self.addDockWidget(Qt.LeftDockWidgetArea, self.left)
         self.left.refresh_windows()
         self.left.list_windows.currentRowChanged.connect(lambda _: self.left.populate_widgets())
+        self.left.list_windows.currentRowChanged.connect(lambda _: self._rebuild_bindings())
         self.left.list_windows.setCurrentRow(0)
 
         # right dock — версия из project.json
@@ -55,8 +72,8 @@ class MainWindow(QMainWindow):
 
     def _add_widget_from_palette(self, wtype: str, parent_id: str | None):
         screen = self._get_current_screen()
-        new_id = normalize_c_identifier(f"{wtype}_{len(screen['widgets'])+1}")
-        node = {"id": new_id, "type": wtype, "props": {"name": wtype}, "children": []}
+        new_id = unique_widget_id(screen, wtype)
+        node = make_node(new_id, wtype, {"name": wtype}, self.compact)
 
         def add_under(lst):
             for n in lst:
@@ -65,13 +82,73 @@ class MainWindow(QMainWindow):
                 if add_under(n.get("children", [])): return True
             return False
 
-        if parent_id and add_under(screen["widgets"]):
-            pass
-        else:
+        if not (parent_id and add_under(screen["widgets"])):
+            parent_id = None
             screen["widgets"].append(node)
 
+        # индекс (если уже построен) правим на месте: новый виджет — последний среди соседей
+        idx = self._spatial.get(id(screen))
+        if idx is not None:
+            pbox = idx.box(parent_id) if parent_id else None
+            idx.insert(new_id, widget_box(node, pbox[:2] if pbox else (0, 0)), parent_id)
+
         save_project(self.project_path, self.data)
         self.left.populate_widgets()
+        self._rebuild_bindings()  # новый виджет — новые строки дерева и граф привязок
+        self.left.refresh_thumbnail(screen, changed=True)
+
+    def _rebuild_bindings(self):
+        """Движок привязок текущего экрана; flush — не чаще раза в кадр."""
+        self.live_props.clear()
+        self._bindings_gen += 1
+        gen = self._bindings_gen
+        current = lambda: gen == self._bindings_gen
+
+        def on_update(widget_id: str, props: dict):
+            if current():
+                self._on_binding_update(widget_id, props)
+
+        def after_flush():
+            if current():
+                self.left.tree_vars.update_values(engine.values)
+
+        try:
+            engine = BindingEngine(self._get_current_screen(), on_update,
+                                   schedule=lambda f: QTimer.singleShot(16, f))
+            engine.after_flush = after_flush
+            self.bindings = engine
+        except ValueError as e:  # BindingError и ошибки значений
+            self.bindings = None
+            self.statusBar().showMessage(f"Variables: {e}", 5000)
+        self.left.populate_vars(self.bindings.values if self.bindings else {})
+
+    def _on_binding_update(self, widget_id: str, props: dict):
+        self.live_props.setdefault(widget_id, {}).update(props)
+        self.left.tree_widgets.set_live(widget_id, self.live_props[widget_id])
+
+    def _set_variable(self, name: str, value: str):
+        if self.bindings is None: return
+        try:
+            self.bindings.set(name, value)
+        except (BindingError, ValueError) as e:
+            self.statusBar().showMessage(f"{name}: {e}", 5000)
+            self.left.tree_vars.update_values(self.bindings.values)
+
+    def spatial_index(self, screen: dict | None = None) -> SpatialIndex:
+        """Индекс боксов экрана для hit-test/выделения; строится лениво."""
+        screen = screen or self._get_current_screen()
+        idx = self._spatial.get(id(screen))
+        if idx is None:
+            tgt = self.data.get("project", {}).get("target", {})
+            idx = SpatialIndex.from_screen(screen, tgt.get("resX", 320), tgt.get("resY", 240))
+            self._spatial[id(screen)] = idx
+        return idx
+
+    def widget_at(self, x: int, y: int) -> str | None:
+        return self.spatial_index().topmost_at(x, y)
+
+    def widgets_in_rect(self, x: int, y: int, w: int, h: int, fully: bool = True) -> list[str]:
+        return self.spatial_index().in_rect((x, y, w, h), fully=fully)
 
     def _make_menus(self):
         m_file = self.menuBar().addMenu("File")
@@ -112,9 +189,11 @@ class MainWindow(QMainWindow):
             patch = dlg.patch()
             proj["lvgl_version"] = patch["lvgl_version"]
             proj.setdefault("target", {}).update(patch["target"])
+            self._spatial.clear()  # поменялось разрешение экрана
             save_project(self.project_path, self.data)
             # перезагрузить палитру под новую версию
             self.right.reload_palette(proj["lvgl_version"])
+            self.left.refresh_windows()  # миниатюры под новое разрешение
 
     def _set_theme(self, theme: str):
         self.act_theme_dark.setChecked(theme=="dark")
@@ -130,13 +209,21 @@ class MainWindow(QMainWindow):
     def on_file_export(self): pass
     def on_file_import(self): pass
     def on_project_new(self): pass
-    def on_project_build(self): pass
-    def on_project_check(self): pass
+    def on_project_build(self):
+        if not self.on_project_check(): return
+        written = write_sources(self.data, self.project_path / "generated")
+        self.statusBar().showMessage(f"Build: {len(written)} file(s) updated", 5000)
+    def on_project_check(self) -> bool:
+        version = self.data.get("project", {}).get("lvgl_version", "v8")
+        errors = check_project(self.data, known_widget_types(version))
+        self.statusBar().showMessage("Check: ok" if not errors else f"Check: {errors[0]} (+{len(errors)-1})", 5000)
+        return not errors
     def on_project_export(self): pass
 
 def main():
     app = QApplication(sys.argv)
-    w = MainWindow(Path("./proj_demo"), app)
+    args = app.arguments()[1:]  # Qt убирает свои ключи (-style и т.п.)
+    w = MainWindow(Path(args[0] if args else "./proj_demo"), app)
     w.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,353 @@
+# src/friendlyui/bindings.py
+from __future__ import annotations
+import ast
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Привязка переменных экрана к props виджетов. Без Qt.
+#
+# screen["vars"]:   [{"name": "temp", "type": "int", "value": 20},
+#                    {"name": "hot",  "type": "bool", "expr": "temp > 30"}]
+# widget props:     {"bind": {"text": "temp", "hidden": "hot"}, "text_fmt": "%d C"}
+#
+# Переменная с "expr" — производная: пересчитывается из других переменных.
+# Изменение переменной помечает её грязной; flush() пересчитывает
+# производные в топологическом порядке и отдаёт в on_update только те
+# виджеты и props, значения которых действительно поменялись.
+
+VAR_TYPES = {"int": 0, "bool": False, "str": ""}
+
+# prop -> типы виджетов, у которых его можно привязать (None — у всех)
+BINDABLE_PROPS = {
+    "text": {"lv_label"},
+    "value": {"lv_bar", "lv_slider", "lv_arc"},
+    "hidden": None,
+}
+
+# prop -> типы переменных, которые к нему можно привязать.
+# str для hidden запрещён: в C проверялся бы указатель, а не пустота строки.
+BINDABLE_VAR_TYPES = {
+    "text": {"int", "bool", "str"},
+    "value": {"int", "bool"},
+    "hidden": {"int", "bool"},
+}
+
+# одна printf-конверсия в text_fmt, подходящая к типу переменной, без l/h
+# (codegen передаёт int-переменные как (int))
+_FMT_CONV = re.compile(r"%[-+ #0]*\d*(?:\.\d+)?(l{0,2}|h{0,2})([a-zA-Z])")
+_FMT_OK = {"str": "s", "int": "diuxXoc", "bool": "diuxXoc"}
+
+_BIN_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%"}
+_CMP_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_MISSING = object()
+
+C_IDENT = re.compile(r'^[A-Za-z_][0-9A-Za-z_]*$')  # имя идёт в C-символы — только ASCII
+
+
+class BindingError(ValueError):
+    pass
+
+
+# --- выражения производных переменных ---
+
+def parse_expr(expr: str) -> ast.expr:
+    """Разбор выражения; допускаются числа, имена, + - * / %, сравнения, and/or/not."""
+    try:
+        tree = ast.parse(expr, mode="eval").body
+    except SyntaxError as e:
+        raise BindingError(f"bad expression '{expr}': {e.msg}") from None
+    for n in ast.walk(tree):
+        if isinstance(n, (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Name, ast.Load,
+                          ast.And, ast.Or, ast.Not, ast.USub)):
+            if isinstance(n, ast.BinOp) and type(n.op) not in _BIN_OPS:
+                raise BindingError(f"operator not allowed in '{expr}'")
+            if isinstance(n, ast.Compare) and len(n.ops) != 1:
+                raise BindingError(f"chained comparison not allowed in '{expr}'")
+            continue
+        if type(n) in _BIN_OPS or type(n) in _CMP_OPS:
+            continue
+        if isinstance(n, ast.Constant) and type(n.value) in (int, bool):
+            continue
+        raise BindingError(f"'{type(n).__name__}' not allowed in '{expr}'")
+    return tree
+
+
+def expr_names(tree: ast.expr) -> Set[str]:
+    return {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+
+
+def _wrap32(x: int) -> int:
+    """Как int32_t в сгенерированном C (арифметика по модулю 2**32)."""
+    return (int(x) + 2**31) % 2**32 - 2**31
+
+
+def eval_expr(tree: ast.expr, env: Dict[str, object]):
+    """
+    Вычисление с семантикой сгенерированного C (см. C_EXPR_HELPERS):
+    int32 с переполнением по модулю, деление и остаток с усечением к нулю,
+    x / 0 и x % 0 дают 0.
+    """
+    if isinstance(tree, ast.Constant):
+        return tree.value
+    if isinstance(tree, ast.Name):
+        return env[tree.id]
+    if isinstance(tree, ast.UnaryOp):
+        v = eval_expr(tree.operand, env)
+        return (not v) if isinstance(tree.op, ast.Not) else _wrap32(-v)
+    if isinstance(tree, ast.BoolOp):
+        vals = (bool(eval_expr(v, env)) for v in tree.values)
+        return all(vals) if isinstance(tree.op, ast.And) else any(vals)
+    if isinstance(tree, ast.Compare):
+        a, b = eval_expr(tree.left, env), eval_expr(tree.comparators[0], env)
+        op = _CMP_OPS[type(tree.ops[0])]
+        return {"==": a == b, "!=": a != b, "<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[op]
+    a, b = int(eval_expr(tree.left, env)), int(eval_expr(tree.right, env))
+    op = type(tree.op)
+    if op is ast.Add: return _wrap32(a + b)
+    if op is ast.Sub: return _wrap32(a - b)
+    if op is ast.Mult: return _wrap32(a * b)
+    if b == 0:
+        return 0
+    q = _wrap32(abs(a) // abs(b) * (1 if (a >= 0) == (b >= 0) else -1))
+    return q if op is ast.Div else _wrap32(a - b * q)
+
+
+# Арифметика выражений в C: без UB на переполнении и делении на 0 / INT32_MIN / -1.
+C_EXPR_HELPERS = """\
+static inline int32_t ui_expr_add(int32_t a, int32_t b) { return (int32_t)((uint32_t)a + (uint32_t)b); }
+static inline int32_t ui_expr_sub(int32_t a, int32_t b) { return (int32_t)((uint32_t)a - (uint32_t)b); }
+static inline int32_t ui_expr_mul(int32_t a, int32_t b) { return (int32_t)((uint32_t)a * (uint32_t)b); }
+static inline int32_t ui_expr_neg(int32_t a) { return (int32_t)(0u - (uint32_t)a); }
+static inline int32_t ui_expr_div(int32_t a, int32_t b) { return b == 0 ? 0 : b == -1 ? ui_expr_neg(a) : a / b; }
+static inline int32_t ui_expr_mod(int32_t a, int32_t b) { return (b == 0 || b == -1) ? 0 : a % b; }
+"""
+_C_HELPER = {ast.Add: "ui_expr_add", ast.Sub: "ui_expr_sub", ast.Mult: "ui_expr_mul",
+             ast.Div: "ui_expr_div", ast.Mod: "ui_expr_mod"}
+
+
+def expr_to_c(tree: ast.expr, name_of: Callable[[str], str]) -> str:
+    if isinstance(tree, ast.Constant):
+        return str(int(tree.value))
+    if isinstance(tree, ast.Name):
+        return name_of(tree.id)
+    if isinstance(tree, ast.UnaryOp):
+        if isinstance(tree.op, ast.Not):
+            return f"!({expr_to_c(tree.operand, name_of)})"
+        return f"ui_expr_neg({expr_to_c(tree.operand, name_of)})"
+    if isinstance(tree, ast.BoolOp):
+        op = " && " if isinstance(tree.op, ast.And) else " || "
+        return "(" + op.join(expr_to_c(v, name_of) for v in tree.values) + ")"
+    if isinstance(tree, ast.Compare):
+        op = _CMP_OPS[type(tree.ops[0])]
+        return f"({expr_to_c(tree.left, name_of)} {op} {expr_to_c(tree.comparators[0], name_of)})"
+    return f"{_C_HELPER[type(tree.op)]}({expr_to_c(tree.left, name_of)}, {expr_to_c(tree.right, name_of)})"
+
+
+def coerce(vtype: str, value):
+    if vtype == "int": return _wrap32(value)  # как int32_t в C
+    if vtype == "bool": return bool(value) if not isinstance(value, str) else value.lower() in ("1", "true", "yes", "on")
+    return str(value)
+
+
+# --- граф зависимостей ---
+
+def _walk(nodes):
+    for n in nodes:
+        yield n
+        yield from _walk(n.get("children", []))
+
+
+def default_fmt(vtype: str) -> str:
+    return "%s" if vtype == "str" else "%d"
+
+
+def _check_fmt(widget_id: str, fmt: str, vtype: str):
+    """text_fmt уходит и в fmt % value, и в lv_label_set_text_fmt — проверяем для обоих."""
+    convs = [m.groups() for m in _FMT_CONV.finditer(fmt.replace("%%", ""))]
+    if len(convs) != 1 or convs[0][0] or convs[0][1] not in _FMT_OK[vtype]:
+        raise BindingError(f"{widget_id}: text_fmt '{fmt}' needs exactly one conversion for {vtype} variable")
+
+
+class BindingGraph:
+    """
+    Статическая часть: переменные, разобранные выражения, топологический
+    порядок производных и рёбра var -> [(widget_id, prop)].
+    """
+
+    def __init__(self, screen: dict):
+        self.vars: Dict[str, dict] = {}
+        self.exprs: Dict[str, ast.expr] = {}
+        self.dependents: Dict[str, List[str]] = {}       # var -> производные, читающие её
+        self.bound: Dict[str, List[Tuple[str, str]]] = {}  # var -> [(widget_id, prop)]
+        self.widgets: Dict[str, dict] = {}
+
+        for v in screen.get("vars", []):
+            name = v.get("name", "")
+            if not C_IDENT.match(name):
+                raise BindingError(f"invalid variable name '{name}'")
+            if name in self.vars:
+                raise BindingError(f"duplicate variable '{name}'")
+            vtype = v.get("type", "int")
+            if vtype not in VAR_TYPES:
+                raise BindingError(f"variable '{name}': unknown type '{vtype}'")
+            try:
+                coerce(vtype, v.get("value", VAR_TYPES[vtype]))
+            except (TypeError, ValueError):
+                raise BindingError(f"variable '{name}': value {v.get('value')!r} is not {vtype}") from None
+            self.vars[name] = v
+
+        for name, v in self.vars.items():
+            if "expr" not in v:
+                continue
+            if v.get("type", "int") == "str":
+                raise BindingError(f"variable '{name}': str variables cannot have expr")
+            tree = parse_expr(v["expr"])
+            for dep in expr_names(tree):
+                if dep not in self.vars:
+                    raise BindingError(f"variable '{name}': unknown variable '{dep}' in expr")
+                if self.vars[dep].get("type", "int") == "str":
+                    raise BindingError(f"variable '{name}': str variable '{dep}' in expr")
+                self.dependents.setdefault(dep, []).append(name)
+            self.exprs[name] = tree
+
+        self.order = self._topo_order()
+
+        for n in _walk(screen.get("widgets", [])):
+            bind = n.get("props", {}).get("bind") or {}
+            for prop, var in bind.items():
+                allowed = BINDABLE_PROPS.get(prop, ())
+                if allowed is not None and n["type"] not in allowed:
+                    raise BindingError(f"{n['id']}: prop '{prop}' is not bindable on {n['type']}")
+                if var not in self.vars:
+                    raise BindingError(f"{n['id']}: unknown variable '{var}'")
+                vtype = self.vars[var].get("type", "int")
+                if vtype not in BINDABLE_VAR_TYPES.get(prop, ()):
+                    raise BindingError(f"{n['id']}: {vtype} variable '{var}' cannot be bound to '{prop}'")
+                if prop == "text" and n.get("props", {}).get("text_fmt"):
+                    _check_fmt(n["id"], n["props"]["text_fmt"], vtype)
+                self.bound.setdefault(var, []).append((n["id"], prop))
+                self.widgets[n["id"]] = n
+
+    def _topo_order(self) -> List[str]:
+        """Производные переменные в порядке вычисления (Kahn); цикл — ошибка."""
+        indeg = {name: len(expr_names(t)) for name, t in self.exprs.items()}
+        # константные выражения ({"expr": "5"}) готовы сразу, как и базовые
+        const = [name for name in self.exprs if indeg[name] == 0]
+        ready = [name for name in self.vars if name not in self.exprs] + const
+        order = list(const)
+        while ready:
+            cur = ready.pop()
+            for d in self.dependents.get(cur, ()):
+                indeg[d] -= 1
+                if indeg[d] == 0:
+                    order.append(d); ready.append(d)
+        if len(order) != len(self.exprs):
+            cyc = sorted(set(self.exprs) - set(order))
+            raise BindingError(f"cyclic variable expressions: {', '.join(cyc)}")
+        return order
+
+    def affected(self, changed: Iterable[str]) -> List[str]:
+        """Производные, зависящие (транзитивно) от changed, в порядке вычисления."""
+        seen: Set[str] = set()
+        stack = list(changed)
+        while stack:
+            for d in self.dependents.get(stack.pop(), ()):
+                if d not in seen:
+                    seen.add(d); stack.append(d)
+        return [name for name in self.order if name in seen]
+
+    def prop_value(self, widget_id: str, prop: str, value):
+        """Значение prop виджета для значения переменной."""
+        if prop == "text":
+            var = self.widgets[widget_id]["props"]["bind"]["text"]
+            fmt = self.widgets[widget_id]["props"].get("text_fmt") or default_fmt(self.vars[var].get("type", "int"))
+            try:
+                return fmt % value
+            except (TypeError, ValueError):
+                return str(value)
+        if prop == "hidden":
+            return bool(value)
+        return int(value)
+
+
+def check_screen_bindings(screen: dict) -> List[str]:
+    try:
+        BindingGraph(screen)
+    except BindingError as e:
+        return [str(e)]
+    return []
+
+
+class BindingEngine:
+    """
+    Рантайм редактора. set() только помечает переменную; пересчёт идёт в
+    flush(), который планируется через schedule один раз на кадр
+    (в GUI — QTimer.singleShot). Без schedule flush() вызывается сразу.
+    """
+
+    def __init__(self, screen: dict, on_update: Callable[[str, Dict[str, object]], None],
+                 schedule: Optional[Callable[[Callable[[], None]], None]] = None):
+        self.screen = screen
+        self.on_update = on_update
+        self.schedule = schedule
+        self.after_flush: Optional[Callable[[], None]] = None  # после каждого непустого flush
+        self._dirty: Set[str] = set()
+        self._scheduled = False
+        self.rebuild()
+
+    def rebuild(self):
+        """Перечитать vars/bind экрана и пересчитать всё (после правок структуры)."""
+        self.graph = BindingGraph(self.screen)
+        self.values: Dict[str, object] = {}
+        for name, v in self.graph.vars.items():
+            vtype = v.get("type", "int")
+            self.values[name] = coerce(vtype, v.get("value", VAR_TYPES[vtype]))
+        for name in self.graph.order:
+            self.values[name] = coerce(self.graph.vars[name].get("type", "int"),
+                                       eval_expr(self.graph.exprs[name], self.values))
+        self._applied: Dict[Tuple[str, str], object] = {}
+        self._dirty = set(self.graph.vars)
+        self.flush()
+
+    def get(self, name: str):
+        return self.values[name]
+
+    def set(self, name: str, value):
+        if name in self.graph.exprs:
+            raise BindingError(f"variable '{name}' is computed from '{self.graph.vars[name]['expr']}'")
+        value = coerce(self.graph.vars[name].get("type", "int"), value)
+        if self.values[name] == value:
+            return
+        self.values[name] = value
+        self._dirty.add(name)
+        if self.schedule is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.flush)
+
+    def flush(self):
+        """Пересчитать производные и отдать on_update только изменившиеся props."""
+        self._scheduled = False
+        if not self._dirty:
+            return
+        changed = set(self._dirty); self._dirty.clear()
+        for name in self.graph.affected(changed):
+            new = coerce(self.graph.vars[name].get("type", "int"),
+                         eval_expr(self.graph.exprs[name], self.values))
+            if new != self.values[name] or name in changed:
+                self.values[name] = new
+                changed.add(name)
+
+        updates: Dict[str, Dict[str, object]] = {}
+        for name in changed:
+            for wid, prop in self.graph.bound.get(name, ()):
+                val = self.graph.prop_value(wid, prop, self.values[name])
+                if self._applied.get((wid, prop), _MISSING) != val:
+                    self._applied[(wid, prop)] = val
+                    updates.setdefault(wid, {})[prop] = val
+        for wid, props in updates.items():
+            self.on_update(wid, props)
+        if self.after_flush is not None:
+            self.after_flush()
+
@@ -0,0 +1,136 @@
+# src/friendlyui/cli.py
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+# Headless-режим: check / build / export без Qt.
+# Здесь нельзя импортировать app/dock_*/themes/settings_dialog — они тянут PySide6.
+from .models import load_project, check_project
+from .widgets_registry import known_widget_types
+from .codegen import generate, write_sources
+
+EXIT_OK = 0
+EXIT_CHECK_FAILED = 1
+EXIT_ERROR = 2
+
+
+def _do_check(path: Path, data: dict, out: Optional[Path], name: str) -> List[str]:
+    return check_project(data, known_widget_types(data.get("project", {}).get("lvgl_version", "v8")))
+
+
+def _do_build(path: Path, data: dict, out: Optional[Path], name: str) -> List[str]:
+    errors = _do_check(path, data, out, name)
+    if errors:
+        return errors
+    out_dir = out / name if out else path / "generated"
+    written = write_sources(data, out_dir)
+    print(f"{path}: {len(written)} file(s) updated in {out_dir}", file=sys.stderr)
+    return []
+
+
+def _do_export(path: Path, data: dict, out: Optional[Path], name: str) -> List[str]:
+    """Архив <name>.zip: project.json + сгенерированные исходники."""
+    errors = _do_check(path, data, out, name)
+    if errors:
+        return errors
+    out_dir = out or path
+    out_dir.mkdir(parents=True, exist_ok=True)
+    archive = out_dir / f"{name}.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("project.json", json.dumps(data, indent=2))
+        for fname, text in generate(data).items():
+            zf.writestr(f"generated/{fname}", text)
+    print(f"{path}: exported {archive}", file=sys.stderr)
+    return []
+
+
+COMMANDS = {"check": _do_check, "build": _do_build, "export": _do_export}
+
+
+def output_names(paths: List[str]) -> List[str]:
+    """
+    Имена выходов (<out>/<name>/, <out>/<name>.zip) для проектов.
+    Обычно это имя каталога; если имена совпадают (variants/*/ui) — путь
+    относительно общего предка через "_". Один и тот же проект дважды — ошибка.
+    """
+    resolved = [Path(p).resolve() for p in paths]
+    if len(set(resolved)) != len(resolved):
+        raise ValueError("the same project is listed more than once")
+    names = [p.name for p in resolved]
+    if len(set(names)) == len(names):
+        return names
+    common = Path(os.path.commonpath(resolved))
+    names = ["_".join(p.relative_to(common).parts) or p.name for p in resolved]
+    if len(set(names)) != len(names):
+        raise ValueError("cannot derive distinct output names for the given projects")
+    return names
+
+
+def run_one(command: str, path: str, out: Optional[str] = None, name: Optional[str] = None) -> dict:
+    """Выполнить команду над одним проектом. Вызывается и в воркерах пула."""
+    t0 = time.perf_counter()
+    p = Path(path)
+    try:
+        data = load_project(p)
+        errors = COMMANDS[command](p, data, Path(out) if out else None, name or p.resolve().name)
+        code = EXIT_CHECK_FAILED if errors else EXIT_OK
+    except Exception as e:
+        errors, code = [f"{type(e).__name__}: {e}"], EXIT_ERROR
+    return {"project": path, "command": command, "exit_code": code,
+            "seconds": round(time.perf_counter() - t0, 4), "errors": errors}
+
+
+def run_many(command: str, paths: List[str], out: Optional[str] = None, jobs: int = 0) -> List[dict]:
+    """Параллельный прогон по проектам; порядок результатов совпадает с paths."""
+    names = output_names(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) == 1:
+        return [run_one(command, p, out, n) for p, n in zip(paths, names)]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(pool.map(run_one, [command] * len(paths), paths, [out] * len(paths), names))
+
+
+def _print_report(results: List[dict], total: float):
+    for r in results:
+        status = {EXIT_OK: "ok", EXIT_CHECK_FAILED: "FAILED", EXIT_ERROR: "ERROR"}[r["exit_code"]]
+        print(f"{status:6} {r['seconds']:8.3f}s  {r['project']}")
+        for err in r["errors"]:
+            print(f"         - {err}")
+    failed = sum(1 for r in results if r["exit_code"])
+    print(f"{len(results)} project(s), {failed} failed, {total:.3f}s total")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="friendlyui", description="FriendlyUI headless batch mode")
+    ap.add_argument("command", choices=sorted(COMMANDS))
+    ap.add_argument("projects", nargs="+", help="project directories (with project.json)")
+    ap.add_argument("-o", "--out", help="output directory (build: <out>/<name>/, export: <out>/<name>.zip; "
+                         "name is the project directory, or its path from the common parent if names clash)")
+    ap.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: CPU count)")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        results = run_many(args.command, args.projects, args.out, args.jobs)
+    except ValueError as e:
+        print(f"friendlyui: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    total = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps({"results": results, "seconds": round(total, 4)}, indent=2))
+    else:
+        _print_report(results, total)
+    return max((r["exit_code"] for r in results), default=EXIT_OK)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
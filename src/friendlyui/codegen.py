@@ -0,0 +1,233 @@
+# src/friendlyui/codegen.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List
+from .bindings import BindingGraph, expr_to_c, default_fmt, coerce, VAR_TYPES, C_EXPR_HELPERS
+
+# Генерация C-кода LVGL (ui.h / ui.c) из project.json. Без Qt.
+
+# конструкторы, которые не сводятся к <type>_create(parent);
+# {parent} подставляется, остальное — аргументы по умолчанию
+_CREATE_V8 = {
+    "lv_span": "lv_spangroup_create({parent})",
+    "lv_msgbox": "lv_msgbox_create({parent}, NULL, NULL, NULL, false)",
+    "lv_tabview": "lv_tabview_create({parent}, LV_DIR_TOP, 50)",
+    "lv_spinner": "lv_spinner_create({parent}, 1000, 60)",
+    "lv_colorwheel": "lv_colorwheel_create({parent}, true)",
+}
+_CREATE_V9 = {
+    "lv_span": "lv_spangroup_create({parent})",
+    "lv_img": "lv_image_create({parent})",
+    "lv_btnmatrix": "lv_buttonmatrix_create({parent})",
+    "lv_meter": None,        # в v9 виджета нет (и в палитре v9 его нет)
+    "lv_colorwheel": None,
+}
+
+
+def _create_call(wtype: str, parent: str, v9: bool) -> str:
+    fmt = (_CREATE_V9 if v9 else _CREATE_V8).get(wtype, f"{wtype}_create({{parent}})")
+    if fmt is None:
+        raise ValueError(f"{wtype} is not available in LVGL {'v9' if v9 else 'v8'}")
+    return fmt.format(parent=parent)
+
+
+def _color(hex_str: str) -> str:
+    return f"lv_color_hex(0x{hex_str.lstrip('#').upper()})"
+
+
+def _c_string(s: str) -> str:
+    return '"' + str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _walk(nodes, parent: str):
+    for n in nodes:
+        yield n, parent
+        yield from _walk(n.get("children", []), n["id"])
+
+
+def _emit_props(out: List[str], var: str, node: dict):
+    p = node.get("props", {})
+    if "x" in p or "y" in p:
+        out.append(f"    lv_obj_set_pos({var}, {int(p.get('x', 0))}, {int(p.get('y', 0))});")
+    if "width" in p or "height" in p:
+        w = int(p["width"]) if "width" in p else "LV_SIZE_CONTENT"
+        h = int(p["height"]) if "height" in p else "LV_SIZE_CONTENT"
+        out.append(f"    lv_obj_set_size({var}, {w}, {h});")
+    if "text" in p and node["type"] == "lv_label":
+        out.append(f"    lv_label_set_text({var}, {_c_string(p['text'])});")
+    if "bg_color" in p:
+        out.append(f"    lv_obj_set_style_bg_color({var}, {_color(p['bg_color'])}, 0);")
+    if p.get("hidden"):
+        out.append(f"    lv_obj_add_flag({var}, LV_OBJ_FLAG_HIDDEN);")
+
+
+_C_TYPES = {"int": "int32_t", "bool": "bool", "str": "const char *"}
+_SET_VALUE = {"lv_bar": "lv_bar_set_value({o}, {v}, LV_ANIM_OFF)",
+              "lv_slider": "lv_slider_set_value({o}, {v}, LV_ANIM_OFF)",
+              "lv_arc": "lv_arc_set_value({o}, {v})"}
+
+
+def _c_literal(vtype: str, value) -> str:
+    if vtype == "str":
+        return _c_string(value)
+    if vtype == "bool":
+        return "true" if value else "false"
+    return str(int(value))
+
+
+def _emit_bindings(h: List[str], c: List[str], screen: dict, v9: bool):
+    """
+    Переменные экрана: сеттеры с проверкой на изменение. Сеттер обновляет
+    только привязанные к переменной виджеты и пересчитывает зависимые
+    производные — без опроса в цикле.
+    """
+    g = BindingGraph(screen)
+    if not g.vars:
+        return
+    sc = screen["c_name"]
+    # хранилище и apply — со своими префиксами, чтобы не пересечься с
+    # ui_<sc>_create и ui_<sc>_set_/get_<name> (переменные create, set_x, x_apply)
+    var_c = lambda name: f"ui_{sc}_v_{name}"
+    apply_fn = lambda name: f"ui_{sc}_apply_{name}"
+    vtype = lambda name: g.vars[name].get("type", "int")
+
+    for name in g.vars:
+        ct = _C_TYPES[vtype(name)]
+        if name not in g.exprs:
+            h.append(f"void ui_{sc}_set_{name}({ct} v);")
+        h.append(f"{ct} ui_{sc}_get_{name}(void);")
+    h.append("")
+
+    c.append(f"/* {sc}: variables */")
+    for name, v in g.vars.items():
+        t = vtype(name)
+        init = _c_literal(t, coerce(t, v.get("value", VAR_TYPES[t])))
+        c.append(f"static {_C_TYPES[t]}{'' if t == 'str' else ' '}{var_c(name)} = {init};")
+    c.append("")
+
+    # _apply — только для переменных, к которым что-то привязано
+    clear_flag = "lv_obj_remove_flag" if v9 else "lv_obj_clear_flag"
+    for name in g.vars:
+        if not g.bound.get(name):
+            continue
+        t, cur = vtype(name), var_c(name)
+        c += [f"static void {apply_fn(name)}(void)", "{", f"    if ({sc} == NULL) return;  /* экран ещё не создан */"]
+        for wid, prop in g.bound[name]:
+            obj = f"{sc}_{wid}"
+            if prop == "text":
+                fmt = g.widgets[wid]["props"].get("text_fmt") or default_fmt(t)
+                arg = cur if t == "str" else f"(int){cur}"
+                c.append(f"    lv_label_set_text_fmt({obj}, {_c_string(fmt)}, {arg});")
+            elif prop == "value":
+                c.append("    " + _SET_VALUE[g.widgets[wid]["type"]].format(o=obj, v=cur) + ";")
+            elif prop == "hidden":
+                c.append(f"    if ({cur}) lv_obj_add_flag({obj}, LV_OBJ_FLAG_HIDDEN);"
+                         f" else {clear_flag}({obj}, LV_OBJ_FLAG_HIDDEN);")
+        c += ["}", ""]
+
+    for name in g.vars:
+        t, cur, ct = vtype(name), var_c(name), _C_TYPES[vtype(name)]
+        if name not in g.exprs:
+            # как BindingEngine.flush: сначала все производные в топологическом
+            # порядке, потом каждый изменившийся виджет — ровно один раз
+            same = f"v == {cur} || (v && {cur} && strcmp(v, {cur}) == 0)" if t == "str" else f"v == {cur}"
+            if t == "str":
+                c.append("/* строка не копируется: v должна жить, пока привязана */")
+            c += [f"void ui_{sc}_set_{name}({ct} v)", "{",
+                  f"    if ({same}) return;",
+                  f"    {cur} = v;"]
+            derived = g.affected([name])
+            for d in derived:
+                dcur, expr = var_c(d), expr_to_c(g.exprs[d], var_c)
+                if g.bound.get(d):
+                    c += [f"    {_C_TYPES[vtype(d)]} nv_{d} = {expr};",
+                          f"    bool ch_{d} = nv_{d} != {dcur};",
+                          f"    {dcur} = nv_{d};"]
+                else:
+                    c.append(f"    {dcur} = {expr};")
+            if g.bound.get(name):
+                c.append(f"    {apply_fn(name)}();")
+            for d in derived:
+                if g.bound.get(d):
+                    c.append(f"    if (ch_{d}) {apply_fn(d)}();")
+            c += ["}", ""]
+        c += [f"{ct} ui_{sc}_get_{name}(void)", "{", f"    return {cur};", "}", ""]
+
+
+def _emit_bindings_init(c: List[str], screen: dict):
+    """В конце ui_<screen>_create: посчитать производные и применить все значения."""
+    g = BindingGraph(screen)
+    sc = screen["c_name"]
+    for name in g.order:
+        c.append(f"    ui_{sc}_v_{name} = {expr_to_c(g.exprs[name], lambda n: f'ui_{sc}_v_{n}')};")
+    for name in g.vars:
+        if g.bound.get(name):
+            c.append(f"    ui_{sc}_apply_{name}();")
+
+
+def generate(data: dict) -> Dict[str, str]:
+    """Возвращает {имя_файла: содержимое} для всех экранов проекта."""
+    screens = data.get("screens", [])
+    v9 = str(data.get("project", {}).get("lvgl_version", "v8")).lower().startswith("v9")
+
+    h = ["/* Generated by FriendlyUI. Do not edit. */",
+         "#ifndef UI_H", "#define UI_H", "", "#include <stdbool.h>", "#include <stdint.h>",
+         '#include "lvgl.h"', ""]
+    for s in screens:
+        h.append(f"extern lv_obj_t *{s['c_name']};")
+        for n, _ in _walk(s.get("widgets", []), s["c_name"]):
+            h.append(f"extern lv_obj_t *{s['c_name']}_{n['id']};")
+    h.append("")
+    for s in screens:
+        h.append(f"void ui_{s['c_name']}_create(void);")
+    h += ["void ui_init(void);", ""]
+
+    c = ["/* Generated by FriendlyUI. Do not edit. */", "#include <string.h>", '#include "ui.h"', ""]
+    for s in screens:
+        c.append(f"lv_obj_t *{s['c_name']};")
+        for n, _ in _walk(s.get("widgets", []), s["c_name"]):
+            c.append(f"lv_obj_t *{s['c_name']}_{n['id']};")
+    c.append("")
+    if any(BindingGraph(s).exprs for s in screens):
+        c += [C_EXPR_HELPERS]
+    for s in screens:
+        _emit_bindings(h, c, s, v9)
+    h += ["#endif /* UI_H */", ""]
+    for s in screens:
+        sc = s["c_name"]
+        c += [f"void ui_{sc}_create(void)", "{",
+              f"    {sc} = lv_obj_create(NULL);"]
+        if s.get("bg_color"):
+            c.append(f"    lv_obj_set_style_bg_color({sc}, {_color(s['bg_color'])}, 0);")
+        for n, parent in _walk(s.get("widgets", []), sc):
+            var = f"{sc}_{n['id']}"
+            parent_var = sc if parent == sc else f"{sc}_{parent}"
+            c.append(f"    {var} = {_create_call(n['type'], parent_var, v9)};")
+            _emit_props(c, var, n)
+        _emit_bindings_init(c, s)
+        c += ["}", ""]
+    c += ["void ui_init(void)", "{"]
+    for s in screens:
+        c.append(f"    ui_{s['c_name']}_create();")
+    if screens:
+        load_fn = "lv_screen_load" if v9 else "lv_scr_load"
+        c.append(f"    {load_fn}({screens[0]['c_name']});")
+    c += ["}", ""]
+
+    return {"ui.h": "\n".join(h), "ui.c": "\n".join(c)}
+
+
+def write_sources(data: dict, out_dir: Path) -> List[Path]:
+    """
+    Пишет сгенерированные файлы в out_dir. Файл перезаписывается только если
+    содержимое поменялось — чтобы make/CMake не пересобирали прошивку зря.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, text in generate(data).items():
+        p = out_dir / name
+        if p.exists() and p.read_text(encoding="utf-8") == text:
+            continue
+        p.write_text(text, encoding="utf-8")
+        written.append(p)
+    return written
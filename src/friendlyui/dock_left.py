@@ -1,15 +1,18 @@
 # src/friendlyui/dock_left.py
 from __future__ import annotations
 from typing import Callable, Dict
-from PySide6.QtWidgets import QDockWidget, QWidget, QVBoxLayout, QGroupBox, QListWidget, QTreeWidget, QTreeWidgetItem
+from PySide6.QtWidgets import QDockWidget, QWidget, QVBoxLayout, QGroupBox, QListWidget, QListWidgetItem, QTreeWidget, QTreeWidgetItem
+from PySide6.QtGui import QIcon, QPixmap, QColor
 from PySide6.QtCore import Qt, QMimeData, QByteArray, QPoint
+from .thumbnails import THUMB_SIZE
 
 class WidgetsTree(QTreeWidget):
     def __init__(self, get_screen_cb, add_widget_cb):
         super().__init__()
         self.get_screen_cb = get_screen_cb
         self.add_widget_cb = add_widget_cb
-        self.setHeaderLabels(["Widget", "Type", "id"])
+        self.setHeaderLabels(["Widget", "Type", "id", "Live"])
+        self._items: Dict[str, QTreeWidgetItem] = {}  # id -> строка дерева
         self.setAcceptDrops(True)
         self.setDragEnabled(False)
         self.setDropIndicatorShown(True)
@@ -38,8 +41,10 @@ class WidgetsTree(QTreeWidget):
 
     def populate(self, screen: dict):
         self.clear()
+        self._items.clear()
         def add_node(parent_item, node):
             it = QTreeWidgetItem([node.get("props",{}).get("name", node["type"]), node["type"], node["id"]])
+            self._items[node["id"]] = it
             if parent_item: parent_item.addChild(it)
             else: self.addTopLevelItem(it)
             for ch in node.get("children", []):
@@ -48,18 +53,67 @@ class WidgetsTree(QTreeWidget):
             add_node(None, w)
         self.expandToDepth(1)
 
+    def set_live(self, widget_id: str, props: dict):
+        """Значения из привязок переменных: колонка Live, скрытые — серым."""
+        it = self._items.get(widget_id)
+        if it is None: return
+        it.setText(3, ", ".join(f"{k}={v}" for k, v in props.items() if k != "hidden"))
+        hidden = bool(props.get("hidden"))
+        for col in range(self.columnCount()):
+            it.setForeground(col, self.palette().placeholderText() if hidden else self.palette().text())
+
+class VariablesTree(QTreeWidget):
+    """Переменные экрана и их текущие значения; базовые можно править."""
+    def __init__(self, set_var_cb=None):
+        super().__init__()
+        self.set_var_cb = set_var_cb
+        self.setHeaderLabels(["Variable", "Value"])
+        self._filling = False
+        self.itemChanged.connect(self._on_item_changed)
+
+    def populate(self, screen: dict, values: dict):
+        self._filling = True
+        self.clear()
+        for v in screen.get("vars", []):
+            name = v.get("name", "")
+            it = QTreeWidgetItem([name, str(values.get(name, v.get("value", "")))])
+            if "expr" in v:
+                it.setToolTip(1, v["expr"])  # производная — только чтение
+            else:
+                it.setFlags(it.flags() | Qt.ItemIsEditable)
+            self.addTopLevelItem(it)
+        self._filling = False
+
+    def update_values(self, values: dict):
+        self._filling = True
+        for i in range(self.topLevelItemCount()):
+            it = self.topLevelItem(i)
+            if it.text(0) in values:
+                it.setText(1, str(values[it.text(0)]))
+        self._filling = False
+
+    def _on_item_changed(self, it, col):
+        if self._filling or col != 1 or self.set_var_cb is None:
+            return
+        self.set_var_cb(it.text(0), it.text(1))
+
 class LeftDock(QDockWidget):
-    def __init__(self, get_project_dict, get_screen_cb, add_widget_cb, parent=None):
+    def __init__(self, get_project_dict, get_screen_cb, add_widget_cb, set_var_cb=None, thumbs=None, parent=None):
         super().__init__("Project")
         self.get_project_dict = get_project_dict
         self.get_screen_cb = get_screen_cb
         self.add_widget_cb = add_widget_cb
+        self.thumbs = thumbs  # ThumbnailCache | None
+        if self.thumbs is not None:
+            self.thumbs.ready.connect(self._on_thumb_ready)
 
         root = QWidget(); self.setWidget(root)
         lay = QVBoxLayout(root); lay.setContentsMargins(6,6,6,6); lay.setSpacing(8)
 
         self.gb1 = QGroupBox("Windows"); l1 = QVBoxLayout(self.gb1)
         self.list_windows = QListWidget(); l1.addWidget(self.list_windows)
+        self.list_windows.setIconSize(THUMB_SIZE)
+        self.list_windows.setUniformItemSizes(True)
         lay.addWidget(self.gb1)
 
         self.gb2 = QGroupBox("Widgets (selected window)"); l2 = QVBoxLayout(self.gb2)
@@ -68,14 +122,59 @@ class LeftDock(QDockWidget):
         lay.addWidget(self.gb2, 1)
 
         self.gb3 = QGroupBox("Variables (context)"); l3 = QVBoxLayout(self.gb3)
-        l3.addWidget(QListWidget())
+        self.tree_vars = VariablesTree(set_var_cb)
+        l3.addWidget(self.tree_vars)
         lay.addWidget(self.gb3)
 
     def refresh_windows(self):
         proj = self.get_project_dict()
+        row = self.list_windows.currentRow()
+        self.list_windows.blockSignals(True)
         self.list_windows.clear()
         for s in proj["screens"]:
-            self.list_windows.addItem(f"{s['title']} ({s['c_name']})")
+            it = QListWidgetItem(f"{s['title']} ({s['c_name']})")
+            it.setData(Qt.UserRole, s["c_name"])
+            self.list_windows.addItem(it)
+            self.refresh_thumbnail(s, it)
+        self.list_windows.setCurrentRow(row)
+        self.list_windows.blockSignals(False)
+
+    def refresh_thumbnail(self, screen: dict, item: QListWidgetItem | None = None, changed: bool = False):
+        """Запросить миниатюру экрана (changed — экран правили); пока рендерится — заглушка."""
+        if self.thumbs is None:
+            return
+        if changed:
+            self.thumbs.invalidate(screen["c_name"])
+        if item is None:
+            item = self._window_item(screen["c_name"])
+            if item is None: return
+        tgt = self.get_project_dict().get("project", {}).get("target", {})
+        img = self.thumbs.request(screen["c_name"], screen, (tgt.get("resX", 320), tgt.get("resY", 240)))
+        if img is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(img)))
+        elif item.icon().isNull():
+            item.setIcon(self._placeholder_icon())
+
+    def _window_item(self, c_name: str) -> QListWidgetItem | None:
+        for i in range(self.list_windows.count()):
+            it = self.list_windows.item(i)
+            if it.data(Qt.UserRole) == c_name:
+                return it
+        return None
+
+    def _on_thumb_ready(self, c_name: str, img):
+        it = self._window_item(c_name)
+        if it is not None:
+            it.setIcon(QIcon(QPixmap.fromImage(img)))
+
+    def _placeholder_icon(self) -> QIcon:
+        if not hasattr(self, "_placeholder"):
+            pm = QPixmap(THUMB_SIZE); pm.fill(QColor(58, 60, 66))
+            self._placeholder = QIcon(pm)
+        return self._placeholder
 
     def populate_widgets(self):
         self.tree_widgets.populate(self.get_screen_cb())
+
+    def populate_vars(self, values: dict):
+        self.tree_vars.populate(self.get_screen_cb(), values)
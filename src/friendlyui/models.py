@@ -1,6 +1,8 @@
 # src/friendlyui/models.py
 import re, json
 from pathlib import Path
+from .nodes import json_default
+from .bindings import check_screen_bindings, C_IDENT
 
 DEFAULT_PROJECT = {
     "project": {
@@ -12,6 +14,8 @@ DEFAULT_PROJECT = {
     "screens": [{"title":"Main","c_name":"screen_main","bg_color":"#101010","widgets":[], "vars":[]}]
 }
 
+GEOMETRY_PROPS = ("x", "y", "width", "height")  # codegen и spatial ждут здесь int
+
 def normalize_c_identifier(s: str) -> str:
     s = s.strip()
     s = re.sub(r'[^0-9A-Za-z_]+', '_', s)
@@ -19,6 +23,19 @@ def normalize_c_identifier(s: str) -> str:
         s = '_' + s
     return s.lower()
 
+def unique_widget_id(screen: dict, wtype: str) -> str:
+    """Первый свободный <wtype>_<n> во всём дереве экрана, а не только на верхнем уровне."""
+    used = set()
+    stack = list(screen.get("widgets", []))
+    while stack:
+        n = stack.pop()
+        used.add(n["id"])
+        stack.extend(n.get("children", []))
+    base, i = normalize_c_identifier(wtype), 1
+    while f"{base}_{i}" in used:
+        i += 1
+    return f"{base}_{i}"
+
 def load_or_create_project(path: Path) -> dict:
     pj = path / "project.json"
     if pj.exists():
@@ -30,5 +47,55 @@ def load_or_create_project(path: Path) -> dict:
     pj.write_text(json.dumps(DEFAULT_PROJECT, indent=2), encoding="utf-8")
     return json.loads(json.dumps(DEFAULT_PROJECT))
 
+def load_project(path: Path) -> dict:
+    """Строгая загрузка без создания дефолтного проекта (для headless-режима)."""
+    pj = path / "project.json"
+    if not pj.exists():
+        raise FileNotFoundError(f"{pj}: project.json not found")
+    return json.loads(pj.read_text(encoding="utf-8"))
+
+def check_project(data: dict, known_types=None) -> list[str]:
+    """
+    Проверка структуры project.json. Возвращает список ошибок (пустой — всё ок).
+    known_types — множество допустимых типов виджетов (из палитры версии).
+    """
+    errors = []
+    ident = C_IDENT
+    screens = data.get("screens")
+    if not screens:
+        return ["project has no screens"]
+    c_names = set()
+    for s in screens:
+        c_name = s.get("c_name", "")
+        if not ident.match(c_name):
+            errors.append(f"screen '{s.get('title', '?')}': invalid c_name '{c_name}'")
+        elif c_name in c_names:
+            errors.append(f"screen '{c_name}': duplicate c_name")
+        c_names.add(c_name)
+        errors += [f"{c_name}: {e}" for e in check_screen_bindings(s)]
+
+        ids = set()  # имена в C — {c_name}_{id}, так что id уникальны в пределах экрана
+        stack = list(s.get("widgets", []))
+        while stack:
+            n = stack.pop()
+            wid = n.get("id", "")
+            if not ident.match(wid):
+                errors.append(f"{c_name}: invalid widget id '{wid}'")
+            elif wid in ids:
+                errors.append(f"{c_name}: duplicate widget id '{wid}'")
+            ids.add(wid)
+            if known_types is not None and n.get("type") not in known_types:
+                errors.append(f"{c_name}/{wid}: unknown widget type '{n.get('type')}'")
+            props = n.get("props", {})
+            for key in GEOMETRY_PROPS:
+                v = props.get(key, 0)
+                # bool — подкласс int, но в lv_obj_set_pos/size ему не место
+                if type(v) is not int:
+                    errors.append(f"{c_name}/{wid}: '{key}' must be an integer, got {v!r}")
+                elif v < 0 and key in ("width", "height"):
+                    errors.append(f"{c_name}/{wid}: '{key}' must not be negative")
+            stack.extend(n.get("children", []))
+    return errors
+
 def save_project(path: Path, data: dict):
-    (path / "project.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+    (path / "project.json").write_text(json.dumps(data, indent=2, default=json_default), encoding="utf-8")
@@ -0,0 +1,229 @@
+# src/friendlyui/nodes.py
+from __future__ import annotations
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Компактное in-memory представление дерева виджетов.
+# Узлы ведут себя как dict {"id","type","props","children", ...}, поэтому
+# остальной код (дерево, индекс, codegen) работает с ними без изменений.
+# Прочие ключи узла (locked и т.п.) хранятся в _extra и не теряются.
+# В JSON узлы превращаются только при сохранении (см. json_default).
+
+_intern = sys.intern
+
+
+class PropsLayout:
+    """
+    Общая "форма" набора props: кортеж ключей + переходы к формам с ещё
+    одним ключом. Узлы с одинаковым набором ключей делят один layout и
+    хранят у себя только список значений.
+    """
+    __slots__ = ("keys", "index", "_next")
+
+    def __init__(self, keys: Tuple[str, ...] = ()):
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}
+        self._next: Dict[str, PropsLayout] = {}
+
+    def with_key(self, key: str) -> "PropsLayout":
+        nxt = self._next.get(key)
+        if nxt is None:
+            nxt = self._next[key] = PropsLayout(self.keys + (_intern(key),))
+        return nxt
+
+
+EMPTY_LAYOUT = PropsLayout()
+
+
+def _compact_value(v):
+    return _intern(v) if type(v) is str else v
+
+
+class Props:
+    """Словарь props поверх общего PropsLayout."""
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, d: Optional[dict] = None):
+        self._layout = EMPTY_LAYOUT
+        self._values: List[Any] = []
+        if d:
+            for k, v in d.items():
+                self[k] = v
+
+    def __getitem__(self, key):
+        return self._values[self._layout.index[key]]
+
+    def __setitem__(self, key, value):
+        i = self._layout.index.get(key)
+        if i is None:
+            self._layout = self._layout.with_key(key)
+            self._values.append(_compact_value(value))
+        else:
+            self._values[i] = _compact_value(value)
+
+    def __delitem__(self, key):
+        i = self._layout.index[key]
+        layout = EMPTY_LAYOUT
+        for k in self._layout.keys:
+            if k != key:
+                layout = layout.with_key(k)  # та же цепочка — layout остаётся общим
+        self._layout = layout
+        del self._values[i]
+
+    def __contains__(self, key):
+        return key in self._layout.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, default=None):
+        i = self._layout.index.get(key)
+        return default if i is None else self._values[i]
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        v = self[key]
+        del self[key]
+        return v
+
+    def keys(self):
+        return self._layout.keys
+
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return zip(self._layout.keys, self._values)
+
+    def update(self, other: dict):
+        for k, v in other.items():
+            self[k] = v
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._layout.keys, self._values))
+
+
+class WidgetNode:
+    """Узел дерева виджетов со __slots__; props и children создаются лениво."""
+    __slots__ = ("id", "type", "_props", "_children", "_extra")
+
+    _FIELDS = ("id", "type", "props", "children")
+
+    def __init__(self, id: str, type: str, props: Optional[dict] = None, children: Optional[list] = None,
+                 extra: Optional[dict] = None):
+        self.id = _intern(id)
+        self.type = _intern(type)
+        self._props = Props(props) if props else None
+        self._children: Optional[List[WidgetNode]] = children or None
+        self._extra: Optional[dict] = extra or None
+
+    @property
+    def props(self) -> Props:
+        if self._props is None:
+            self._props = Props()
+        return self._props
+
+    @property
+    def children(self) -> List["WidgetNode"]:
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    @children.setter
+    def children(self, value: List["WidgetNode"]):
+        self._children = value
+
+    # --- dict-совместимость ---
+
+    def __getitem__(self, key):
+        if key == "props":
+            return self.props
+        if key in ("id", "type", "children"):
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "props":
+            self._props = value if isinstance(value, Props) else Props(value)
+        elif key in ("id", "type"):
+            setattr(self, key, _intern(value))
+        elif key == "children":
+            self.children = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELDS or self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key):
+        return key in self._FIELDS or (self._extra is not None and key in self._extra)
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        # не создаём пустые props/children ради чтения
+        if key == "props" and self._props is None and default is not None:
+            return default
+        if key == "children" and self._children is None and default is not None:
+            return default
+        return self[key]
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def to_dict(self) -> dict:
+        d = {"id": self.id, "type": self.type,
+             "props": self._props.to_dict() if self._props is not None else {},
+             "children": [ch.to_dict() for ch in self._children or ()]}
+        if self._extra:
+            d.update(self._extra)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "WidgetNode":
+        extra = {k: v for k, v in d.items() if k not in cls._FIELDS}
+        return cls(d["id"], d["type"], d.get("props"),
+                   [cls.from_dict(ch) for ch in d.get("children", [])], extra)
+
+
+def make_node(id: str, type: str, props: dict, compact: bool):
+    """Новый узел в том представлении, в котором работает проект."""
+    if compact:
+        return WidgetNode(id, type, props)
+    return {"id": id, "type": type, "props": props, "children": []}
+
+
+def compact_project(data: dict) -> dict:
+    """Перевести деревья виджетов всех экранов в WidgetNode (in-place)."""
+    for s in data.get("screens", []):
+        s["widgets"] = [n if isinstance(n, WidgetNode) else WidgetNode.from_dict(n)
+                        for n in s.get("widgets", [])]
+    return data
+
+
+def json_default(obj):
+    """default= для json.dumps: сериализация компактных узлов на границе сохранения."""
+    if isinstance(obj, WidgetNode):
+        return obj.to_dict()
+    if isinstance(obj, Props):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
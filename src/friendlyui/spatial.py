@@ -0,0 +1,272 @@
+# src/friendlyui/spatial.py
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Пространственный индекс (loose quadtree) по боксам виджетов экрана.
+# Без зависимостей от Qt: используется и канвасом, и headless-кодом.
+
+Box = Tuple[int, int, int, int]  # x, y, w, h (абсолютные координаты экрана)
+
+DEFAULT_SIZE = (100, 40)
+MAX_ITEMS = 8    # сколько элементов держит узел, прежде чем делиться
+MAX_DEPTH = 12
+
+
+def widget_box(node: dict, origin: Tuple[int, int] = (0, 0)) -> Box:
+    """Бокс виджета из props (x/y/width/height) относительно origin родителя."""
+    p = node.get("props", {})
+    w = int(p.get("width", DEFAULT_SIZE[0]))
+    h = int(p.get("height", DEFAULT_SIZE[1]))
+    return origin[0] + int(p.get("x", 0)), origin[1] + int(p.get("y", 0)), w, h
+
+
+def resolve_boxes(screen: dict) -> Iterator[Tuple[str, Box, Optional[str]]]:
+    """
+    Обходит дерево виджетов в порядке отрисовки (родитель раньше детей,
+    соседи — в порядке списка) и отдаёт (id, абсолютный бокс, parent_id).
+    """
+    def walk(nodes, origin, parent_id):
+        for n in nodes:
+            box = widget_box(n, origin)
+            yield n["id"], box, parent_id
+            yield from walk(n.get("children", []), (box[0], box[1]), n["id"])
+    yield from walk(screen.get("widgets", []), (0, 0), None)
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return (inner[0] >= outer[0] and inner[1] >= outer[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2]
+            and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def _intersects(a: Box, b: Box) -> bool:
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2]
+            and a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+def _has_point(b: Box, x: int, y: int) -> bool:
+    return b[0] <= x < b[0] + b[2] and b[1] <= y < b[1] + b[3]
+
+
+class _Node:
+    __slots__ = ("bounds", "loose", "depth", "items", "kids")
+
+    def __init__(self, bounds: Box, depth: int):
+        x, y, w, h = bounds
+        self.bounds = bounds
+        self.loose = (x - w // 2, y - h // 2, w + 2 * (w // 2), h + 2 * (h // 2))  # bounds, расширенные вдвое
+        self.depth = depth
+        self.items: Dict[str, Box] = {}
+        self.kids: Optional[List[_Node]] = None
+
+    def _split(self):
+        x, y, w, h = self.bounds
+        hw, hh = w // 2, h // 2
+        self.kids = [_Node((x, y, hw, hh), self.depth + 1),
+                     _Node((x + hw, y, w - hw, hh), self.depth + 1),
+                     _Node((x, y + hh, hw, h - hh), self.depth + 1),
+                     _Node((x + hw, y + hh, w - hw, h - hh), self.depth + 1)]
+
+    def _accepts(self, box: Box) -> bool:
+        """Центр бокса в bounds, сам бокс — в loose."""
+        return _has_point(self.bounds, box[0] + box[2] // 2, box[1] + box[3] // 2) and _contains(self.loose, box)
+
+    def _child_for(self, box: Box) -> Optional[_Node]:
+        if self.kids:
+            cx, cy = box[0] + box[2] // 2, box[1] + box[3] // 2
+            for k in self.kids:
+                if _has_point(k.bounds, cx, cy):
+                    return k if _contains(k.loose, box) else None
+        return None
+
+
+OrderKey = Tuple[float, ...]
+
+
+class SpatialIndex:
+    """
+    Свободное (loose) квадродерево по боксам виджетов одного экрана.
+    Узел берёт элемент, если в его границах лежит центр бокса, а сам бокс
+    помещается в границы, расширенные вдвое, — поэтому виджеты на линиях
+    деления спускаются вниз, а не копятся в корне. В корне остаются только
+    крупные боксы и вылезающие за экран.
+
+    Порядок отрисовки — ключ-путь: ключ родителя + ключ среди соседей, так
+    что дети идут сразу за родителем. insert(index=...) ставит виджет в
+    любую позицию среди соседей без перенумерации остальных; перемещения
+    и ресайзы — через move()/move_subtree().
+    """
+
+    def __init__(self, width: int, height: int):
+        self.root = _Node((0, 0, max(1, width), max(1, height)), 0)
+        self._where: Dict[str, _Node] = {}
+        self._boxes: Dict[str, Box] = {}
+        self._key: Dict[str, OrderKey] = {}
+        self._parent: Dict[str, Optional[str]] = {}
+        self._children: Dict[Optional[str], List[str]] = {None: []}  # в порядке отрисовки
+
+    @classmethod
+    def from_screen(cls, screen: dict, width: int, height: int) -> "SpatialIndex":
+        idx = cls(width, height)
+        for wid, box, parent_id in resolve_boxes(screen):
+            idx.insert(wid, box, parent_id)
+        return idx
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, wid: str):
+        return wid in self._boxes
+
+    def box(self, wid: str) -> Optional[Box]:
+        return self._boxes.get(wid)
+
+    # --- изменения ---
+
+    def insert(self, wid: str, box: Box, parent_id: Optional[str] = None, index: Optional[int] = None):
+        """
+        Добавить виджет в конец детей parent_id (или на позицию index, как
+        list.insert). Уже существующий wid сначала удаляется вместе с детьми.
+        """
+        if wid in self._boxes:
+            self.remove(wid)
+        if parent_id is not None and parent_id not in self._boxes:
+            raise KeyError(parent_id)
+        sibs = self._children.setdefault(parent_id, [])
+        index = len(sibs) if index is None else max(0, min(index, len(sibs)))
+        sibs.insert(index, wid)
+        self._boxes[wid] = box
+        self._parent[wid] = parent_id
+        key = self._sibling_key(sibs, index)
+        if key is None:
+            self._renumber(parent_id)
+        else:
+            self._key[wid] = self._base_key(parent_id) + (key,)
+        self._place(self.root, wid, box)
+
+    def _base_key(self, parent_id: Optional[str]) -> OrderKey:
+        return self._key[parent_id] if parent_id is not None else ()
+
+    def _sibling_key(self, sibs: List[str], i: int) -> Optional[float]:
+        """Ключ между соседями i-1 и i+1; None — точность float кончилась."""
+        lo = self._key[sibs[i - 1]][-1] if i > 0 else None
+        hi = self._key[sibs[i + 1]][-1] if i + 1 < len(sibs) else None
+        if lo is None:
+            return 0.0 if hi is None else hi - 1.0
+        if hi is None:
+            return lo + 1.0
+        mid = (lo + hi) / 2
+        return mid if lo < mid < hi else None
+
+    def _renumber(self, parent_id: Optional[str]):
+        """Заново раздать ключи детям parent_id и их потомкам (порядок тот же)."""
+        stack = [parent_id]
+        while stack:
+            pid = stack.pop()
+            base = self._base_key(pid)
+            for j, ch in enumerate(self._children.get(pid, ())):
+                self._key[ch] = base + (float(j),)
+                stack.append(ch)
+
+    def move(self, wid: str, box: Box):
+        """Обновить бокс (перемещение/ресайз), сохранив порядок и родителя."""
+        node = self._where.get(wid)
+        if node is None:
+            raise KeyError(wid)
+        self._boxes[wid] = box
+        # остался в том же узле и глубже не спуститься — ничего не делаем
+        if (node is self.root or node._accepts(box)) and node._child_for(box) is None:
+            node.items[wid] = box
+            return
+        del node.items[wid]
+        self._place(self.root, wid, box)
+
+    def move_subtree(self, wid: str, dx: int, dy: int):
+        """Сдвинуть виджет вместе с детьми (их координаты абсолютные)."""
+        stack = [wid]
+        while stack:
+            cur = stack.pop()
+            x, y, w, h = self._boxes[cur]
+            self.move(cur, (x + dx, y + dy, w, h))
+            stack.extend(self._children.get(cur, ()))
+
+    def remove(self, wid: str):
+        """Удалить виджет и всех его потомков."""
+        if wid not in self._boxes:
+            return
+        self._children[self._parent[wid]].remove(wid)
+        stack = [wid]
+        while stack:
+            cur = stack.pop()
+            del self._where.pop(cur).items[cur]
+            del self._boxes[cur], self._key[cur], self._parent[cur]
+            stack.extend(self._children.pop(cur, ()))
+
+    def _place(self, node: _Node, wid: str, box: Box):
+        while True:
+            kid = node._child_for(box)
+            if kid is None:
+                break
+            node = kid
+        node.items[wid] = box
+        self._where[wid] = node
+        if node.kids is None and len(node.items) > MAX_ITEMS and node.depth < MAX_DEPTH:
+            node._split()
+            for other, obox in list(node.items.items()):
+                kid = node._child_for(obox)
+                if kid is not None:
+                    del node.items[other]
+                    kid.items[other] = obox
+                    self._where[other] = kid
+
+    # --- запросы ---
+
+    def _candidates_at(self, x: int, y: int) -> Iterator[str]:
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for wid, b in node.items.items():
+                if _has_point(b, x, y):
+                    yield wid
+            if node.kids:
+                stack.extend(k for k in node.kids if _has_point(k.loose, x, y))
+
+    def at(self, x: int, y: int) -> List[str]:
+        """Все виджеты под точкой, сверху вниз."""
+        return sorted(self._candidates_at(x, y), key=self._key.__getitem__, reverse=True)
+
+    def topmost_at(self, x: int, y: int, among: Iterable[str] | None = None) -> Optional[str]:
+        """Самый верхний виджет под точкой (опционально — только из among)."""
+        allowed = set(among) if among is not None else None
+        best, best_key = None, None
+        for wid in self._candidates_at(x, y):
+            if allowed is not None and wid not in allowed:
+                continue
+            key = self._key[wid]
+            if best_key is None or key > best_key:
+                best, best_key = wid, key
+        return best
+
+    def in_rect(self, rect: Box, fully: bool = False) -> List[str]:
+        """
+        Виджеты, пересекающие rect (fully=True — целиком внутри, как в
+        rubber-band выделении), в порядке отрисовки.
+        """
+        out = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for wid, b in node.items.items():
+                if _contains(rect, b) if fully else _intersects(rect, b):
+                    out.append(wid)
+            if node.kids:
+                stack.extend(k for k in node.kids if _intersects(k.loose, rect))
+        out.sort(key=self._key.__getitem__)
+        return out
+
+    def parent_of(self, wid: str) -> Optional[str]:
+        return self._parent.get(wid)
+
+    def children_of(self, wid: Optional[str]) -> List[str]:
+        """Дети wid (None — верхний уровень) в порядке отрисовки."""
+        return list(self._children.get(wid, ()))
@@ -0,0 +1,154 @@
+# src/friendlyui/thumbnails.py
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QSize, Signal
+from PySide6.QtGui import QColor, QImage, QPainter
+from .nodes import json_default
+from .spatial import resolve_boxes
+
+# Миниатюры экранов для списка Windows.
+# Рендер идёт в QImage на пуле потоков (QPixmap вне GUI-потока нельзя),
+# кэш — в памяти (по ревизии экрана) и на диске (по хэшу содержимого,
+# который считает воркер).
+
+THUMB_SIZE = QSize(96, 72)
+CACHE_DIR = ".friendlyui/thumbs"
+
+_WIDGET_FILL = QColor(58, 60, 66)
+_WIDGET_ACCENT = QColor(53, 132, 228)
+_WIDGET_BORDER = QColor(230, 230, 230, 90)
+_ACCENT_TYPES = {"lv_btn", "lv_button", "lv_bar", "lv_slider", "lv_switch", "lv_arc", "lv_checkbox"}
+
+
+def screen_snapshot(screen: dict, res: Tuple[int, int]) -> Tuple[str, str]:
+    """(json-снимок экрана для воркера, хэш содержимого)."""
+    text = json.dumps({"res": res, "size": [THUMB_SIZE.width(), THUMB_SIZE.height()], "screen": screen},
+                      sort_keys=True, default=json_default)
+    return text, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def render_thumbnail(screen: dict, res: Tuple[int, int]) -> QImage:
+    """Упрощённый рендер экрана: фон + боксы виджетов в порядке отрисовки."""
+    rw, rh = max(1, res[0]), max(1, res[1])
+    scale = min(THUMB_SIZE.width() / rw, THUMB_SIZE.height() / rh)
+    img = QImage(max(1, round(rw * scale)), max(1, round(rh * scale)), QImage.Format_ARGB32_Premultiplied)
+    img.fill(QColor(screen.get("bg_color") or "#101010"))
+
+    types = {}
+    stack = list(screen.get("widgets", []))
+    while stack:
+        n = stack.pop()
+        types[n["id"]] = n["type"]
+        stack.extend(n.get("children", []))
+
+    p = QPainter(img)
+    p.scale(scale, scale)
+    p.setPen(_WIDGET_BORDER)
+    for wid, (x, y, w, h), _ in resolve_boxes(screen):
+        p.setBrush(_WIDGET_ACCENT if types[wid] in _ACCENT_TYPES else _WIDGET_FILL)
+        p.drawRect(x, y, w, h)
+    p.end()
+    return img
+
+
+class _Signals(QObject):
+    done = Signal(str, int, object, str, QImage)  # key, ревизия, res, hash ("" — снимок не удался), image
+
+
+class _RenderTask(QRunnable):
+    """Сериализация, хэш, диск и рендер — всё здесь, GUI-поток только ставит задачу."""
+    def __init__(self, key: str, rev: int, screen: dict, res: Tuple[int, int],
+                 cache_dir: Optional[Path], signals: _Signals):
+        super().__init__()
+        self.key, self.rev, self.screen, self.res = key, rev, screen, res
+        self.cache_dir, self.signals = cache_dir, signals
+
+    def run(self):
+        # done уходит всегда, иначе _inflight/_pending в кэше зависнут навсегда;
+        # digest "" — снимок не удался (например, экран правят прямо сейчас —
+        # правка поднимет ревизию и придёт новый запрос)
+        digest, img = "", QImage()
+        try:
+            snapshot, digest = screen_snapshot(self.screen, self.res)
+            disk_path = self.cache_dir / f"{digest}.png" if self.cache_dir else None
+            if disk_path is not None and disk_path.exists():
+                img.load(str(disk_path))
+            if img.isNull():
+                snap = json.loads(snapshot)
+                img = render_thumbnail(snap["screen"], tuple(snap["res"]))
+                if disk_path is not None:
+                    disk_path.parent.mkdir(parents=True, exist_ok=True)
+                    img.save(str(disk_path), "PNG")
+        except Exception:
+            digest, img = "", QImage()
+        finally:
+            self.signals.done.emit(self.key, self.rev, self.res, digest, img)
+
+
+class ThumbnailCache(QObject):
+    """
+    request(key, screen, res) отдаёт готовую миниатюру из памяти или ставит
+    рендер в фон; по готовности испускается ready(key, image) в GUI-потоке.
+
+    В GUI-потоке экран не сериализуется: память проверяется по счётчику
+    ревизий (invalidate() после правки экрана) и разрешению. Хэш содержимого
+    считает воркер — он ключ дискового кэша, так что неизменённый экран
+    между сессиями не перерисовывается.
+    """
+    ready = Signal(str, QImage)
+
+    def __init__(self, project_path: Optional[Path] = None, parent=None):
+        super().__init__(parent)
+        self.cache_dir = project_path / CACHE_DIR if project_path else None
+        self._rev: Dict[str, int] = {}                                   # key -> ревизия
+        self._want: Dict[str, Tuple[int, Tuple[int, int]]] = {}          # key -> последний запрос (rev, res)
+        self._memory: Dict[str, Tuple[int, Tuple[int, int], str, QImage]] = {}  # key -> (rev, res, hash, image)
+        self._pending: Set[Tuple[str, int, Tuple[int, int]]] = set()      # (key, rev, res) в работе
+        self._inflight = 0
+        self._garbage: Set[str] = set()   # хэши PNG, которые можно удалить, когда воркеры стоят
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)    # GUI не должен голодать
+        self._signals = _Signals(self)
+        self._signals.done.connect(self._on_done)
+
+    def invalidate(self, key: str):
+        """Экран key изменился — следующий request() перерисует миниатюру."""
+        self._rev[key] = self._rev.get(key, 0) + 1
+
+    def request(self, key: str, screen: dict, res: Tuple[int, int]) -> Optional[QImage]:
+        rev, res = self._rev.get(key, 0), tuple(res)
+        self._want[key] = (rev, res)
+        cached = self._memory.get(key)
+        if cached is not None and cached[0] == rev and cached[1] == res:
+            return cached[3]
+        if (key, rev, res) not in self._pending:
+            self._pending.add((key, rev, res))
+            self._inflight += 1
+            self.pool.start(_RenderTask(key, rev, screen, res, self.cache_dir, self._signals))
+        return None
+
+    def _on_done(self, key: str, rev: int, res: tuple, digest: str, img: QImage):
+        self._inflight -= 1
+        self._pending.discard((key, rev, res))
+        if digest:
+            if self._want.get(key) == (rev, res):
+                old = self._memory.get(key)
+                self._memory[key] = (rev, res, digest, img)
+                if old is not None and old[2] != digest:
+                    self._garbage.add(old[2])
+                self.ready.emit(key, img)
+            else:
+                self._garbage.add(digest)  # результат устарел
+        self._collect_garbage()
+
+    def _collect_garbage(self):
+        """Удалять файлы только когда ни один воркер не читает и не пишет кэш."""
+        if self._inflight or self.cache_dir is None:
+            return
+        in_use = {m[2] for m in self._memory.values()}
+        for digest in self._garbage - in_use:
+            (self.cache_dir / f"{digest}.png").unlink(missing_ok=True)
+        self._garbage.clear()
@@ -44,3 +44,8 @@ def load_widget_groups(lvgl_version: str):
             groups[gname] = items
 
     return groups
+
+
+def known_widget_types(lvgl_version: str) -> set:
+    """Типы виджетов палитры версии — их же умеет генерировать codegen."""
+    return {wtype for items in load_widget_groups(lvgl_version).values() for wtype, _, _ in items}
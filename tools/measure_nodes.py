@@ -0,0 +1,53 @@
+# tools/measure_nodes.py
+# Память дерева виджетов: dict-узлы против compact-узлов (friendlyui.nodes).
+# python tools/measure_nodes.py [N]
+import gc, json, sys, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from friendlyui.nodes import compact_project, json_default
+
+TYPES = ["lv_obj", "lv_label", "lv_btn", "lv_bar", "lv_slider", "lv_switch", "lv_img", "lv_led"]
+
+def make_project(n: int) -> str:
+    """JSON проекта с n виджетами: 100 экранов, контейнеры по 9 детей."""
+    screens, k = [], 0
+    per_screen = n // 100
+    for si in range(100):
+        widgets = []
+        while len(widgets) * 10 < per_screen:
+            kids = []
+            for _ in range(9):
+                t = TYPES[k % len(TYPES)]
+                kids.append({"id": f"{t}_{k}", "type": t,
+                             "props": {"name": t, "x": k % 300, "y": k % 200, "width": 40, "height": 20},
+                             "children": []})
+                k += 1
+            widgets.append({"id": f"lv_obj_{k}", "type": "lv_obj",
+                            "props": {"name": "lv_obj", "x": 0, "y": 0, "width": 320, "height": 240},
+                            "children": kids})
+            k += 1
+        screens.append({"title": f"S{si}", "c_name": f"screen_{si}", "widgets": widgets, "vars": []})
+    return json.dumps({"project": {"name": "bench"}, "screens": screens})
+
+def measure(text: str, compact: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    if compact:
+        compact_project(data)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert json.loads(json.dumps(data, default=json_default)) == json.loads(text)
+    del data
+    return size
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    text = make_project(n)
+    plain = measure(text, compact=False)
+    comp = measure(text, compact=True)
+    print(f"widgets:  {n}")
+    print(f"dict:     {plain / 2**20:8.1f} MiB")
+    print(f"compact:  {comp / 2**20:8.1f} MiB  (-{100 * (1 - comp / plain):.0f}%)")